@@ -0,0 +1,126 @@
+"""
+Fused per-pixel kernels used by channel_handler.
+
+The kernels are JIT-compiled with Numba when it is installed, which removes the
+temporary arrays NumPy would allocate. Without Numba, equivalent NumPy versions
+with identical results are used instead.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def any_nonzero_per_channel(planes: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean per row of a planar (channels, pixels) array telling whether it has any non-zero value.
+        Each channel stops scanning at its first non-zero value.
+        """
+        num_channels, num_pixels = planes.shape
+        used = np.zeros(num_channels, dtype=np.bool_)
+
+        for c in range(num_channels):
+            for i in range(num_pixels):
+                if planes[c, i] != 0.0:
+                    used[c] = True
+                    break
+
+        return used
+
+    @njit(inline="always")
+    def _isclose(a: float, b: float, rtol: float, atol: float) -> bool:
+        if a == b:
+            return True
+        if np.isinf(a) or np.isinf(b):
+            return False
+        return abs(a - b) <= atol + rtol * abs(b)
+
+    @njit(cache=True)
+    def rgb_allclose(
+        pixels: np.ndarray,
+        r: int,
+        g: int,
+        b: int,
+        rtol: float = 1e-05,
+        atol: float = 1e-08,
+    ) -> bool:
+        """
+        Checks whether the R, G and B channels of a (rows, width, channels) array are equal,
+        with the same tolerances as np.allclose. Returns on the first pixel that differs.
+        """
+        height, width, _ = pixels.shape
+
+        for y in range(height):
+            for x in range(width):
+                red, green, blue = pixels[y, x, r], pixels[y, x, g], pixels[y, x, b]
+                if not (
+                    _isclose(red, green, rtol, atol)
+                    and _isclose(green, blue, rtol, atol)
+                ):
+                    return False
+
+        return True
+
+    @njit(parallel=True, cache=True)
+    def float_to_uint8(src: np.ndarray, dst: np.ndarray) -> None:
+        """
+        Scales a float (height, width) array from [0, 1] to [0, 255] and writes it into a uint8 array.
+        Multiply, clip and cast happen in a single pass without a float temporary.
+        """
+        height, width = src.shape
+
+        for y in prange(height):
+            for x in range(width):
+                value = src[y, x] * 255.0
+                if value >= 255.0:
+                    dst[y, x] = 255
+                elif value > 0.0:
+                    dst[y, x] = np.uint8(value)
+                else:  # Also catches NaN
+                    dst[y, x] = 0
+
+else:
+    # Number of values reduced at a time before checking whether a channel is used
+    _SCAN_CHUNK_SIZE = 1 << 16
+
+    def any_nonzero_per_channel(planes: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean per row of a planar (channels, pixels) array telling whether it has any non-zero value.
+        Each channel is scanned in chunks and stops at the first chunk with a non-zero value.
+        """
+        used = np.zeros(planes.shape[0], dtype=np.bool_)
+
+        for c, plane in enumerate(planes):
+            for start in range(0, plane.size, _SCAN_CHUNK_SIZE):
+                if plane[start : start + _SCAN_CHUNK_SIZE].any():
+                    used[c] = True
+                    break
+
+        return used
+
+    def rgb_allclose(
+        pixels: np.ndarray,
+        r: int,
+        g: int,
+        b: int,
+        rtol: float = 1e-05,
+        atol: float = 1e-08,
+    ) -> bool:
+        """Checks whether the R, G and B channels of a (rows, width, channels) array are equal."""
+        red, green, blue = pixels[:, :, r], pixels[:, :, g], pixels[:, :, b]
+        return bool(
+            np.allclose(red, green, rtol=rtol, atol=atol)
+            and np.allclose(green, blue, rtol=rtol, atol=atol)
+        )
+
+    def float_to_uint8(src: np.ndarray, dst: np.ndarray) -> None:
+        """Scales a float (height, width) array from [0, 1] to [0, 255] and writes it into a uint8 array."""
+        scaled = np.multiply(src, 255.0, dtype=np.float32)
+        np.clip(scaled, 0.0, 255.0, out=scaled)
+        np.copyto(dst, np.nan_to_num(scaled, copy=False), casting="unsafe")
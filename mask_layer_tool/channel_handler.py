@@ -1,6 +1,41 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import OpenImageIO as oiio
 import numpy as np
 
+from mask_layer_tool._kernels import (
+    any_nonzero_per_channel,
+    rgb_allclose,
+)
+
+# Number of scanlines read at a time when an image is processed in bands
+_BAND_HEIGHT = 256
+
+
+def _iter_row_bands(
+    image: oiio.ImageBuf, chbegin: int, chend: int, band_height: int = _BAND_HEIGHT
+):
+    """
+    Yields the pixel data of a channel range as float32 (rows, width, channels) bands of scanlines.
+    Parameters:
+        image (oiio.ImageBuf): The image object to read.
+        chbegin (int): Index of the first channel to read.
+        chend (int): Index one past the last channel to read.
+        band_height (int): Number of scanlines per band.
+    Yields:
+        tuple[int, int, np.ndarray]: The first and one-past-last scanline of each band and its
+        pixel data, from top to bottom.
+    """
+    spec = image.spec()
+
+    for ybegin in range(0, spec.height, band_height):
+        yend = min(ybegin + band_height, spec.height)
+        roi = oiio.ROI(0, spec.width, ybegin, yend, 0, 1, chbegin, chend)
+        band = np.asarray(image.get_pixels(oiio.FLOAT, roi), dtype=np.float32)
+        yield ybegin, yend, band.reshape((yend - ybegin, spec.width, chend - chbegin))
+
 
 def detect_channels(image: oiio.ImageBuf) -> dict:
     """
@@ -13,16 +48,22 @@ def detect_channels(image: oiio.ImageBuf) -> dict:
     if not image.initialized:
         raise ValueError("Invalid or uninitialized image.")
 
-    spec = image.spec()
-    channels = spec.channelnames
+    channels = image.spec().channelnames
+    any_nonzero = np.zeros(len(channels), dtype=np.bool_)
 
-    roi = oiio.ROI(0, spec.width, 0, spec.height, 0, 1, 0, len(channels))
-    pixel_data = np.array(image.get_pixels(oiio.FLOAT, roi)).reshape(
-        (spec.height, spec.width, len(channels))
-    )
+    # Scan band by band, only reducing the channels not yet found to be used,
+    # and stop reading once every channel is known to be used
+    for _, _, band in _iter_row_bands(image, 0, len(channels)):
+        pending = np.flatnonzero(~any_nonzero)
+        # Indexing the transposed band gives contiguous planes of just the pending channels
+        planes = band.reshape((-1, len(channels))).T[pending]
+        any_nonzero[pending] = any_nonzero_per_channel(planes)
+
+        if any_nonzero.all():
+            break
 
     used_channels = {
-        channel: bool(np.any(pixel_data[:, :, i])) for i, channel in enumerate(channels)
+        channel: bool(any_nonzero[i]) for i, channel in enumerate(channels)
     }
 
     return used_channels
@@ -43,18 +84,15 @@ def extract_channel(image: oiio.ImageBuf, channel: str = "R") -> np.ndarray:
     if channel not in channels:
         raise ValueError(f"Channel '{channel}' not found in image.")
 
-    width, height = spec.width, spec.height
-    num_channels = len(channels)
-
-    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, num_channels)
-    pixel_data = image.get_pixels(oiio.FLOAT, roi)
+    channel_index = channels.index(channel)
 
-    pixel_data = np.array(pixel_data, dtype=np.float32).reshape(
-        (height, width, num_channels)
+    # Only decode the requested channel rather than the whole image
+    roi = oiio.ROI(
+        0, spec.width, 0, spec.height, 0, 1, channel_index, channel_index + 1
+    )
+    return np.asarray(image.get_pixels(oiio.FLOAT, roi), dtype=np.float32).reshape(
+        (spec.height, spec.width)
     )
-
-    channel_index = channels.index(channel)
-    return pixel_data[:, :, channel_index]
 
 
 def modify_channel(
@@ -69,34 +107,61 @@ def modify_channel(
     Returns:
         oiio.ImageBuf: A new ImageBuf with the modified channel.
     """
-    spec = image.spec()
-    channels = spec.channelnames
-    width, height = spec.width, spec.height
+    _validate_channel_data(image, channel_data, channel)
 
-    if channel not in channels:
-        raise ValueError(f"Channel '{channel}' not found in image.")
+    # Unchanged channels are copied by OIIO, only the modified channel is written
+    modified_image = image.copy(oiio.FLOAT)
+    _write_channel(modified_image, channel_data, channel)
 
-    if channel_data.shape != (height, width):
-        raise ValueError(
-            "The size of the channel data does not match the image dimensions."
-        )
+    return modified_image
 
-    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, len(channels))
 
-    pixel_data = image.get_pixels(oiio.FLOAT, roi)
-    pixel_data = np.array(pixel_data, dtype=np.float32).reshape(
-        (height, width, len(channels))
-    )
+def modify_channel_inplace(
+    image: oiio.ImageBuf, channel_data: np.ndarray, channel: str = "R"
+) -> oiio.ImageBuf:
+    """
+    Overwrites a specific channel of an OpenImageIO ImageBuf in place, without reading its pixels.
+    Parameters:
+        image (oiio.ImageBuf): The image object to modify.
+        channel_data (np.ndarray): A NumPy array containing new pixel data for the specified channel.
+        channel (str): The name of the channel to modify (default is "R").
+    Returns:
+        oiio.ImageBuf: The same ImageBuf, with the modified channel.
+    """
+    _validate_channel_data(image, channel_data, channel)
+    _write_channel(image, channel_data, channel)
+
+    return image
 
-    channel_index = channels.index(channel)
-    pixel_data[:, :, channel_index] = channel_data
 
-    modified_image = oiio.ImageBuf(
-        oiio.ImageSpec(width, height, len(channels), oiio.FLOAT)
+def _write_channel(
+    image: oiio.ImageBuf, channel_data: np.ndarray, channel: str
+) -> None:
+    """Writes already validated channel data into an ImageBuf in place."""
+    spec = image.spec()
+    channel_index = spec.channelnames.index(channel)
+
+    roi = oiio.ROI(
+        0, spec.width, 0, spec.height, 0, 1, channel_index, channel_index + 1
     )
-    modified_image.set_pixels(roi, pixel_data)
+    pixel_data = np.ascontiguousarray(channel_data, dtype=np.float32)
+    if not image.set_pixels(roi, pixel_data.reshape((spec.height, spec.width, 1))):
+        raise ValueError(f"Failed to modify channel '{channel}': {image.geterror()}")
 
-    return modified_image
+
+def _validate_channel_data(
+    image: oiio.ImageBuf, channel_data: np.ndarray, channel: str
+) -> None:
+    """Raises a ValueError if the channel is missing or the data does not match the image size."""
+    spec = image.spec()
+
+    if channel not in spec.channelnames:
+        raise ValueError(f"Channel '{channel}' not found in image.")
+
+    if channel_data.shape != (spec.height, spec.width):
+        raise ValueError(
+            "The size of the channel data does not match the image dimensions."
+        )
 
 
 def append_channel(
@@ -124,25 +189,119 @@ def append_channel(
             f"Channel data shape {channel_data.shape} does not match image dimensions ({width}x{height})."
         )
 
-    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, existing_channels)
-    pixel_data = np.array(image.get_pixels(oiio.FLOAT, roi)).reshape(
-        (height, width, existing_channels)
-    )
-
-    updated_pixel_data = np.concatenate(
-        [pixel_data, channel_data[..., np.newaxis]], axis=-1
-    )
-
     new_spec = oiio.ImageSpec(width, height, existing_channels + 1, oiio.FLOAT)
     new_spec.channelnames = list(spec.channelnames) + [channel_name]
 
-    new_image = oiio.ImageBuf(new_spec)
-    new_roi = oiio.ROI(0, width, 0, height, 0, 1, 0, existing_channels + 1)
-    new_image.set_pixels(new_roi, updated_pixel_data)
+    # Every pixel is written below, so skip zero-initialising the buffer
+    new_image = oiio.ImageBuf(new_spec, False)
+
+    # Copy the existing channels band by band instead of decoding the whole image at once
+    for ybegin, yend, band in _iter_row_bands(image, 0, existing_channels):
+        band_roi = oiio.ROI(0, width, ybegin, yend, 0, 1, 0, existing_channels)
+        new_image.set_pixels(band_roi, band)
+
+    channel_roi = oiio.ROI(
+        0, width, 0, height, 0, 1, existing_channels, existing_channels + 1
+    )
+    new_image.set_pixels(
+        channel_roi,
+        np.ascontiguousarray(channel_data, dtype=np.float32).reshape(
+            (height, width, 1)
+        ),
+    )
 
     return new_image
 
 
+def create_image_from_channels(
+    channels: list[tuple[str, np.ndarray]], width: int, height: int
+) -> oiio.ImageBuf:
+    """
+    Builds an OIIO ImageBuf from a list of named channels in a single allocation.
+
+    Parameters:
+        channels (list[tuple[str, np.ndarray]]): (name, pixel data) pairs in output channel order.
+        width (int): Width of the output image.
+        height (int): Height of the output image.
+
+    Returns:
+        oiio.ImageBuf: An ImageBuf containing every channel.
+    """
+    if not channels:
+        raise ValueError("At least one channel is required.")
+
+    pixel_data = np.empty((height, width, len(channels)), dtype=np.float32)
+    for i, (channel_name, channel_data) in enumerate(channels):
+        if channel_data.shape != (height, width):
+            raise ValueError(
+                f"Channel '{channel_name}' shape {channel_data.shape} does not match image dimensions ({width}x{height})."
+            )
+        pixel_data[:, :, i] = channel_data
+
+    spec = oiio.ImageSpec(width, height, len(channels), oiio.FLOAT)
+    spec.channelnames = [channel_name for channel_name, _ in channels]
+
+    image = oiio.ImageBuf(spec, False)  # Fully overwritten by set_pixels
+    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, len(channels))
+    image.set_pixels(roi, pixel_data)
+
+    return image
+
+
+def pack_images(images: list[oiio.ImageBuf], channel_names: list[str]) -> oiio.ImageBuf:
+    """
+    Packs every channel of several equally sized images into a single ImageBuf.
+    Images are decoded in parallel and copied in bands of scanlines, so no source image
+    is decoded to float in full.
+
+    Parameters:
+        images (list[oiio.ImageBuf]): The images to pack, in output channel order.
+        channel_names (list[str]): Names for every channel of the packed image.
+
+    Returns:
+        oiio.ImageBuf: An ImageBuf containing the channels of all images.
+    """
+    if not images:
+        raise ValueError("At least one image is required.")
+
+    width, height = images[0].spec().width, images[0].spec().height
+    num_channels = sum(image.spec().nchannels for image in images)
+
+    if len(channel_names) != num_channels:
+        raise ValueError(
+            f"Expected {num_channels} channel names, got {len(channel_names)}."
+        )
+
+    for image in images:
+        spec = image.spec()
+        if (spec.width, spec.height) != (width, height):
+            raise ValueError(
+                f"Image dimensions ({spec.width}x{spec.height}) do not match ({width}x{height})."
+            )
+
+    packed_spec = oiio.ImageSpec(width, height, num_channels, oiio.FLOAT)
+    packed_spec.channelnames = list(channel_names)
+    # Every pixel is written below, so skip zero-initialising the buffer
+    packed_image = oiio.ImageBuf(packed_spec, False)
+
+    # Decoding runs concurrently, writes into the shared output are serialised
+    write_lock = threading.Lock()
+
+    def copy_image(image: oiio.ImageBuf, chbegin: int) -> None:
+        chend = chbegin + image.spec().nchannels
+        for ybegin, yend, band in _iter_row_bands(image, 0, chend - chbegin):
+            roi = oiio.ROI(0, width, ybegin, yend, 0, 1, chbegin, chend)
+            with write_lock:
+                packed_image.set_pixels(roi, band)
+
+    chbegins = np.cumsum([0] + [image.spec().nchannels for image in images[:-1]])
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(copy_image, images, chbegins.tolist()))
+
+    return packed_image
+
+
 def check_is_greyscale(image: oiio.ImageBuf) -> bool:
     """
     Checks if the image is grayscale by verifying if all RGB channels are equal.
@@ -157,14 +316,16 @@ def check_is_greyscale(image: oiio.ImageBuf) -> bool:
     if not {"R", "G", "B"}.issubset(channels):
         return False
 
-    roi = oiio.ROI(0, spec.width, 0, spec.height, 0, 1, 0, len(channels))
-    pixel_data = np.array(image.get_pixels(oiio.FLOAT, roi)).reshape(
-        (spec.height, spec.width, len(channels))
-    )
+    r, g, b = (channels.index(channel) for channel in ("R", "G", "B"))
+    chbegin = min(r, g, b)
+    chend = max(r, g, b) + 1
 
-    return np.allclose(pixel_data[:, :, 0], pixel_data[:, :, 1]) and np.allclose(
-        pixel_data[:, :, 1], pixel_data[:, :, 2]
-    )
+    # Compare band by band so a colour image exits after the first mismatching band
+    for _, _, band in _iter_row_bands(image, chbegin, chend):
+        if not rgb_allclose(band, r - chbegin, g - chbegin, b - chbegin):
+            return False
+
+    return True
 
 
 def create_greyscale_from_channel(
@@ -186,12 +347,16 @@ def create_greyscale_from_channel(
             f"Channel data shape {channel_data.shape} does not match image dimensions ({width}x{height})."
         )
 
-    rgb_data = np.stack([channel_data] * 3, axis=-1)
+    # Write the same plane into each channel rather than building an (H, W, 3) copy
+    pixel_data = np.ascontiguousarray(channel_data, dtype=np.float32).reshape(
+        (height, width, 1)
+    )
 
     spec = oiio.ImageSpec(width, height, 3, oiio.FLOAT)
-    image = oiio.ImageBuf(spec)
+    image = oiio.ImageBuf(spec, False)  # Fully overwritten by set_pixels
 
-    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, 3)
-    image.set_pixels(roi, rgb_data.astype(np.float32))
+    for channel_index in range(3):
+        roi = oiio.ROI(0, width, 0, height, 0, 1, channel_index, channel_index + 1)
+        image.set_pixels(roi, pixel_data)
 
     return image
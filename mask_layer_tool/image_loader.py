@@ -2,6 +2,21 @@ import os
 import OpenImageIO as oiio
 
 
+def _configure_oiio() -> None:
+    """
+    Configure OpenImageIO's global thread pool and OpenEXR reader.
+    Called once when this module is imported.
+    """
+    cpu_count = os.cpu_count() or 1
+
+    oiio.attribute("threads", cpu_count)
+    oiio.attribute("exr_threads", min(4, cpu_count))
+    oiio.attribute("openexr:core", 1)  # Use the OpenEXRCore based reader
+
+
+_configure_oiio()
+
+
 def load_image(image_path: str) -> oiio.ImageBuf:
     """
     Load an image from the given path using OpenImageIO.
@@ -34,8 +49,30 @@ def save_image(
         os.makedirs(destination)
 
     output_path = os.path.join(destination, filename)
+    extension = os.path.splitext(filename)[1]
+
+    # Single-scanline zip is lossless and faster to encode than the default zip.
+    # The caller's spec is restored after the write, so saving has no side effects.
+    previous_compression = image.spec().getattribute("compression")
+    if extension.lower() == ".exr":
+        image.specmod().attribute("compression", "zips")
+
+    # Write next to the output and move it into place, so a failed write
+    # never leaves a partial image behind. The extension selects the format.
+    temp_path = os.path.join(destination, f".{filename}.{os.getpid()}.tmp{extension}")
+    try:
+        if not image.write(temp_path):
+            raise ValueError(
+                f"Failed to save image to {output_path}: {image.geterror() or oiio.geterror()}"
+            )
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-    if not image.write(output_path):
-        raise ValueError(f"Failed to save image to {output_path}")
+        if previous_compression is None:
+            image.specmod().erase_attribute("compression")
+        else:
+            image.specmod().attribute("compression", previous_compression)
 
     print(f"Image saved to {output_path}")
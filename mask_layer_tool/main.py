@@ -3,13 +3,14 @@
 import sys
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from mask_layer_tool.image_loader import load_image, save_image
 from mask_layer_tool.channel_handler import (
     detect_channels,
     extract_channel,
-    append_channel,
-    create_greyscale_from_channel,
+    pack_images,
+    create_image_from_channels,
 )
 
 from PySide6.QtWidgets import QApplication
@@ -48,27 +49,22 @@ def pack(files: list, destination: str) -> None:
 
     print(f"Packing images: {files} into {destination}")
 
-    # Using base image to create a new image with the same dimensions,
-    # would prefer to use a new image specification but OIIO does not
-    # support creating an empty image with no channels properly.
-    # TODO: Figure out how to get working this way, or figure out how
-    # to rename first file channels to include filename.
-    #
-    # spec = oiio.ImageSpec(base_image.spec().width, base_image.spec().height, 0, oiio.FLOAT)
-    # packed_image = oiio.ImageBuf(spec)
+    # Open all files concurrently, OIIO releases the GIL while reading
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        images = list(executor.map(load_image, files))
 
-    base_image = load_image(files[0])
-    packed_image = base_image
+    # Base image channels keep their names, the rest are prefixed with their filename.
+    # TODO: Figure out how to rename first file channels to include filename.
+    channel_names = list(images[0].spec().channelnames)
 
-    for image_path in files[1:]:  # Skip first image cause loaded with base_image
-        image = load_image(image_path)
-        filename = os.path.basename(image_path).split(".")[0]
+    for image_path, image in zip(files[1:], images[1:]):
+        filename = os.path.splitext(os.path.basename(image_path))[0]
+        channel_names.extend(
+            f"{filename}_{channel}" for channel in image.spec().channelnames
+        )
 
-        # Extract and append each channel from the image
-        for channel in image.spec().channelnames:  # might reverse
-            unique_name = f"{filename}_{channel}"
-            channel_data = extract_channel(image, channel)
-            packed_image = append_channel(packed_image, channel_data, unique_name)
+    # Copy all channels into one image band by band rather than decoding every image
+    packed_image = pack_images(images, channel_names)
 
     packed_dir = os.path.join(destination, "packed")
     os.makedirs(packed_dir, exist_ok=True)
@@ -77,8 +73,8 @@ def pack(files: list, destination: str) -> None:
 
 def unpack(source_image_path: str, destination: str) -> None:
     """
-    Unpacks all detected channels from an image, converts each to an RGB grayscale image,
-    and saves them using OpenImageIO.
+    Unpacks all detected channels from an image, converts each to a single-channel
+    grayscale image, and saves them using OpenImageIO.
 
     Parameters:
         source_image_path (str): Path to the source image file.
@@ -102,11 +98,14 @@ def unpack(source_image_path: str, destination: str) -> None:
 
     for ch in channels:
         try:
+            # Only decode the current channel rather than the whole image
             channel_data = extract_channel(image, ch)
-            rgb_greyscale_image = create_greyscale_from_channel(
-                channel_data, width, height
+            # A single luminance channel is read as greyscale by viewers,
+            # so there is no need to encode the same plane three times
+            greyscale_image = create_image_from_channels(
+                [("Y", channel_data)], width, height
             )
-            save_image(rgb_greyscale_image, image_output_dir, f"{ch}.exr")
+            save_image(greyscale_image, image_output_dir, f"{ch}.exr")
         except Exception as e:
             print(f"Skipping channel {ch} due to error: {e}")
 
@@ -1,8 +1,8 @@
 import sys
 import os
-import OpenImageIO as oiio
 import numpy as np
 
+from mask_layer_tool._kernels import float_to_uint8
 from mask_layer_tool.image_loader import load_image, save_image
 from mask_layer_tool.channel_handler import (
     detect_channels,
@@ -23,6 +23,13 @@ from PySide6.QtWidgets import (
     QFrame,
 )
 from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtCore import Qt, QTimer
+
+# Delay before a dropdown change refreshes the preview, so rapid changes only decode once
+_PREVIEW_DELAY_MS = 50
+
+# Number of channel previews kept in memory, each scaled down to the preview label
+_PIXMAP_CACHE_SIZE = 16
 
 
 class ImageChannelSelector(QMainWindow):
@@ -51,7 +58,12 @@ class ImageChannelSelector(QMainWindow):
         self.channel_label = QLabel("Color Channel Preview:", self)
         self.channel_dropdown = QComboBox(self)
         self.channel_dropdown.setEnabled(False)
-        self.channel_dropdown.currentIndexChanged.connect(self.update_preview)
+        self.channel_dropdown.currentIndexChanged.connect(self.schedule_preview_update)
+
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(_PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self.update_preview)
 
         self.preview_label = QLabel(self)
         self.preview_label.setFixedSize(100, 100)
@@ -86,37 +98,47 @@ class ImageChannelSelector(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        self.image_files = []
-        self.image_buffers = []
+        self.image_buffers = []  # (filename, image buffer) pairs in selection order
+        self._channel_index = {}  # Dropdown label -> (image buffer, channel name)
+        self._preview_buf = None
+        self._preview_u8 = None
+        self._pixmap_cache = {}
 
     def open_images(self):
         """
         Opens a file dialog to select image files and loads them into the application.
-        The selected images are stored in self.image_files and their corresponding
-        image buffers are stored in self.image_buffers.
+        The loaded image buffers are stored in self.image_buffers in selection order,
+        each paired with its filename. Repeated filenames get a numbered suffix.
         The channel dropdown is populated with prefixed channel names based on the
-        selected images.
+        selected images, each indexed in self._channel_index.
         """
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, "Select Images", "", "Image Files (*.exr *.png *.jpg *.tif, *.tiff)"
         )
         if file_paths:
-            self.image_files = file_paths
             self.image_buffers = []
+            self._channel_index = {}
+            self._pixmap_cache = {}
             self.channel_dropdown.clear()
-            all_channels = []
 
+            used_filenames = set()
             for image_path in file_paths:
                 image = load_image(image_path)
                 if image.initialized:
-                    filename = os.path.basename(image_path).split(".")[0]
-                    prefixed_channels = [
-                        f"{filename}_{channel}" for channel in image.spec().channelnames
-                    ]
-                    all_channels.extend(prefixed_channels)
-                    self.image_buffers.append(image)
-
-            self.channel_dropdown.addItems(all_channels)
+                    stem = os.path.splitext(os.path.basename(image_path))[0]
+
+                    # Files from different folders may share a name, keep their labels distinct
+                    filename, count = stem, 1
+                    while filename in used_filenames:
+                        count += 1
+                        filename = f"{stem} ({count})"
+                    used_filenames.add(filename)
+
+                    for channel in image.spec().channelnames:
+                        self._channel_index[f"{filename}_{channel}"] = (image, channel)
+                    self.image_buffers.append((filename, image))
+
+            self.channel_dropdown.addItems(list(self._channel_index))
             self.channel_dropdown.setEnabled(True)
 
             self.unpack_button.setEnabled(bool(self.image_buffers))
@@ -138,9 +160,7 @@ class ImageChannelSelector(QMainWindow):
 
         print("Unpacking channels...")
 
-        for image, image_path in zip(self.image_buffers, self.image_files):
-            filename = os.path.basename(image_path).split(".")[0]
-
+        for filename, image in self.image_buffers:
             detected_channels = detect_channels(image)
             for channel, is_used in detected_channels.items():
                 if is_used:
@@ -159,14 +179,14 @@ class ImageChannelSelector(QMainWindow):
         )
         if save_path:
             print(f"Saving packed image to: {save_path}")
-            self.image_buffers[0].write(save_path)
+            self.image_buffers[0][1].write(save_path)
 
     def save_as_greyscale(self):
         """Saves the displayed grayscale image to a file."""
         if self.channel_dropdown.count() == 0:
             return
 
-        selected_channel = self.channel_dropdown.currentText()
+        image, channel_name = self._channel_index[self.channel_dropdown.currentText()]
         save_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Greyscale Image",
@@ -177,78 +197,96 @@ class ImageChannelSelector(QMainWindow):
         if not save_path:
             return
 
-        for image_path, image in zip(self.image_files, self.image_buffers):
-            filename = os.path.basename(image_path).split(".")[0]
-            if selected_channel.startswith(filename):
-                channel_name = selected_channel[len(filename) + 1 :]
-                channel_data = extract_channel(image, channel_name)
+        spec = image.spec()
+        channel_data = extract_channel(image, channel_name)
 
-                width, height = image.spec().width, image.spec().height
-                rgb_greyscale_image = create_greyscale_from_channel(
-                    channel_data, width, height
-                )
+        rgb_greyscale_image = create_greyscale_from_channel(
+            channel_data, spec.width, spec.height
+        )
 
-                save_image(
-                    rgb_greyscale_image,
-                    os.path.dirname(save_path),
-                    filename=os.path.basename(save_path),
-                )
+        save_image(
+            rgb_greyscale_image,
+            os.path.dirname(save_path),
+            filename=os.path.basename(save_path),
+        )
 
-                print(f"Saved greyscale image to: {save_path}")
-                break
+        print(f"Saved greyscale image to: {save_path}")
 
     def clear_selection(self):
         """Clears all selections and resets the UI."""
-        self.image_files = []
         self.image_buffers = []
+        self._channel_index = {}
         self.channel_dropdown.clear()
         self.channel_dropdown.setEnabled(False)
         self.preview_label.clear()
+        self._preview_buf = None
+        self._preview_u8 = None
+        self._pixmap_cache = {}
         self.unpack_button.setEnabled(False)
         self.save_button.setEnabled(False)
         self.save_greyscale_button.setEnabled(False)
         self.clear_button.setEnabled(False)
 
+    def schedule_preview_update(self):
+        """Restarts the preview timer, so only the last of several quick changes is decoded."""
+        self._preview_timer.start()
+
     def update_preview(self):
         """Updates preview based on selected channel."""
         if not self.image_buffers or self.channel_dropdown.count() == 0:
             return
 
         selected_channel = self.channel_dropdown.currentText()
+        pixmap = self._pixmap_cache.pop(selected_channel, None)
+        if pixmap is not None:
+            # Re-insert so the most recently shown preview is evicted last
+            self._pixmap_cache[selected_channel] = pixmap
+            self.preview_label.setPixmap(pixmap)
+            self.save_greyscale_button.setEnabled(True)
+            return
 
-        for image_path, image in zip(self.image_files, self.image_buffers):
-            filename = os.path.basename(image_path).split(".")[0]
-            if selected_channel.startswith(filename):
-                channel_name = selected_channel[len(filename) + 1 :]
-
-                if channel_name not in image.spec().channelnames:
-                    return
-
-                channel_data = extract_channel(image, channel_name)
-
-                width, height = image.spec().width, image.spec().height
-                rgb_greyscale_image = create_greyscale_from_channel(
-                    channel_data, width, height
-                )
+        image, channel_name = self._channel_index[selected_channel]
+        channel_data = extract_channel(image, channel_name)
 
-                roi = oiio.ROI(0, width, 0, height, 0, 1, 0, 3)
-                pixel_data = np.array(
-                    rgb_greyscale_image.get_pixels(oiio.FLOAT, roi)
-                ).reshape((height, width, 3))
+        # Quantize the channel directly into a reused uint8 buffer. The pixmap
+        # copies the pixels, so the buffer can be overwritten by the next preview.
+        if self._preview_u8 is None or self._preview_u8.shape != channel_data.shape:
+            self._preview_u8 = np.empty(channel_data.shape, dtype=np.uint8)
+        float_to_uint8(channel_data, self._preview_u8)
 
-                grayscale_preview = (pixel_data[:, :, 0] * 255).astype(np.uint8)
+        pixmap = self.display_grayscale_image(self._preview_u8)
+        self.save_greyscale_button.setEnabled(True)
 
-                self.display_grayscale_image(grayscale_preview)
-                self.save_greyscale_button.setEnabled(True)
-                break
+        if len(self._pixmap_cache) >= _PIXMAP_CACHE_SIZE:
+            self._pixmap_cache.pop(next(iter(self._pixmap_cache)))
+        self._pixmap_cache[selected_channel] = pixmap
 
     def display_grayscale_image(self, grayscale_data):
-        """Converts NumPy array to QPixmap and displays it in QLabel."""
-        height, width = grayscale_data.shape
-        image = QImage(grayscale_data, width, height, QImage.Format_Grayscale8)
-        pixmap = QPixmap.fromImage(image)
+        """
+        Converts NumPy array to a QPixmap scaled to the preview label, displays it
+        in the QLabel and returns the QPixmap.
+        """
+        # QImage borrows the buffer, so keep it alive on the instance and pass the
+        # row stride explicitly to avoid Qt copying or misreading strided data
+        self._preview_buf = np.ascontiguousarray(grayscale_data, dtype=np.uint8)
+        height, width = self._preview_buf.shape
+        image = QImage(
+            self._preview_buf.data,
+            width,
+            height,
+            self._preview_buf.strides[0],
+            QImage.Format_Grayscale8,
+        )
+        # Only keep a label-sized pixmap, a full resolution one is 4 bytes per pixel
+        pixmap = QPixmap.fromImage(image).scaled(
+            self.preview_label.size(),
+            Qt.KeepAspectRatio,
+            Qt.SmoothTransformation,
+        )
         self.preview_label.setPixmap(pixmap)
 
+        return pixmap
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
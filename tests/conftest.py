@@ -0,0 +1,88 @@
+import getpass
+import os
+import shutil
+import tempfile
+
+import pytest
+import OpenImageIO as oiio
+
+_SHM_DIR = "/dev/shm"
+_shm_basetemp_key = pytest.StashKey[str]()
+
+# Runs kept on tmpfs, like pytest's own retention of the last three base directories
+_SHM_KEPT_RUNS = 3
+
+# Formats the tests write, whose plugins are resolved once up front
+_WARM_FORMATS = ("dummy.tif", "dummy.exr")
+
+
+def _shm_root() -> str | None:
+    """Returns this user's pytest directory on tmpfs, or None if it cannot be used."""
+    if not (os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK)):
+        return None
+
+    try:
+        user = getpass.getuser()
+    except (ImportError, KeyError, OSError):
+        user = "unknown"
+
+    root = os.path.join(_SHM_DIR, f"pytest-of-{user}")
+    os.makedirs(root, mode=0o700, exist_ok=True)
+
+    # /dev/shm is shared, so never use a directory another user created
+    if os.stat(root).st_uid != os.getuid():
+        return None
+
+    return root
+
+
+def _prune_shm_runs(root: str, keep: int) -> None:
+    """Removes all but the newest `keep` run directories under root."""
+    runs = [entry for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False)]
+    runs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+    for entry in runs[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Places pytest's temporary directories on a RAM-backed tmpfs when available,
+    so EXR round-trips in the tests never touch the disk.
+    Runs go under a per-user root that keeps only the newest few, as pytest does.
+    An explicit --basetemp always takes precedence.
+    """
+    if config.option.basetemp is not None:
+        return
+
+    root = _shm_root()
+    if root is None:
+        return
+
+    # Make room for this run before creating its directory
+    _prune_shm_runs(root, _SHM_KEPT_RUNS - 1)
+
+    config.option.basetemp = tempfile.mkdtemp(prefix="pytest-", dir=root)
+    config.stash[_shm_basetemp_key] = config.option.basetemp
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """
+    Removes the tmpfs base directory after a passing run, as tmpfs space is held in memory.
+    After failures it is kept so the test artifacts can be inspected.
+    """
+    basetemp = session.config.stash.get(_shm_basetemp_key, None)
+    if basetemp is not None and exitstatus == pytest.ExitCode.OK:
+        shutil.rmtree(basetemp, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_oiio() -> None:
+    """
+    Initialises OIIO's shared ImageCache and resolves the image writer plugins
+    once per session, so no individual test pays for the plugin lookup.
+    """
+    oiio.ImageCache(shared=True)
+    for filename in _WARM_FORMATS:
+        oiio.ImageOutput.create(filename)
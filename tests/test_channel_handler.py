@@ -6,7 +6,10 @@ from mask_layer_tool.channel_handler import (
     detect_channels,
     extract_channel,
     modify_channel,
+    modify_channel_inplace,
     append_channel,
+    create_image_from_channels,
+    pack_images,
     check_is_greyscale,
     create_greyscale_from_channel,
 )
@@ -64,6 +67,25 @@ def test_detect_used_channels(image_buf_fixture: oiio.ImageBuf) -> None:
     assert channel_status["depth.Z"] is True
 
 
+def test_detect_unused_channels(sample_image_buf: oiio.ImageBuf) -> None:
+    """Tests that all-zero channels are reported as unused."""
+    zero_channel = np.zeros((4, 4), dtype=np.float32)
+    image = append_channel(sample_image_buf, zero_channel, "mask")
+
+    channel_status = detect_channels(image)
+
+    assert channel_status == {"R": True, "G": True, "B": True, "mask": False}
+
+
+def test_detect_channels_multiple_bands() -> None:
+    """Tests that a channel only used in the last scanline band is detected."""
+    width, height = 4, 300  # Taller than one 256-scanline band
+    image = oiio.ImageBuf(oiio.ImageSpec(width, height, 3, oiio.FLOAT))
+    image.setpixel(width - 1, height - 1, (0.0, 0.0, 1.0))
+
+    assert detect_channels(image) == {"R": False, "G": False, "B": True}
+
+
 def test_extract_channel(image_buf_fixture: oiio.ImageBuf) -> None:
     """Tests whether extract_channel_oiio correctly extracts channels."""
     red_channel = extract_channel(image_buf_fixture, "R")
@@ -85,6 +107,31 @@ def test_modify_channel(image_buf_fixture: oiio.ImageBuf) -> None:
     assert np.allclose(modified_alpha, 0.9)  # Ensure Alpha channel is updated correctly
 
 
+def test_modify_channel_inplace(image_buf_fixture: oiio.ImageBuf) -> None:
+    """Tests overwriting a channel in place while leaving the others untouched."""
+    new_depth_data = np.full((4, 4), 0.1, dtype=np.float32)
+    modified_image = modify_channel_inplace(
+        image_buf_fixture, new_depth_data, "depth.Z"
+    )
+
+    assert modified_image is image_buf_fixture
+    assert np.allclose(extract_channel(image_buf_fixture, "depth.Z"), 0.1)
+    assert np.allclose(extract_channel(image_buf_fixture, "R"), 1.0)
+
+
+def test_detect_channels_after_set_pixels(sample_image_buf: oiio.ImageBuf) -> None:
+    """Tests that channel data reflects pixels written after an earlier read."""
+    zero_channel = np.zeros((4, 4), dtype=np.float32)
+    image = append_channel(sample_image_buf, zero_channel, "mask")
+    assert detect_channels(image)["mask"] is False
+
+    roi = oiio.ROI(0, 4, 0, 4, 0, 1, 3, 4)
+    image.set_pixels(roi, np.ones((4, 4, 1), dtype=np.float32))
+
+    assert detect_channels(image)["mask"] is True
+    assert np.allclose(extract_channel(image, "mask"), 1.0)
+
+
 def test_invalid_channel(image_buf_fixture: oiio.ImageBuf) -> None:
     """Tests error handling for invalid channels."""
     with pytest.raises(ValueError):
@@ -129,6 +176,22 @@ def test_check_is_greyscale(
     assert check_is_greyscale(grayscale_image) is True
 
 
+def test_check_is_greyscale_multiple_bands() -> None:
+    """Tests that a colour difference in the last scanline band is detected."""
+    width, height = 4, 300  # Taller than one 256-scanline band
+    pixel_data = np.full((height, width, 3), 0.5, dtype=np.float32)
+    image = oiio.ImageBuf(oiio.ImageSpec(width, height, 3, oiio.FLOAT))
+    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, 3)
+    image.set_pixels(roi, pixel_data)
+
+    assert check_is_greyscale(image) is True
+
+    pixel_data[-1, -1, 2] = 1.0
+    image.set_pixels(roi, pixel_data)
+
+    assert check_is_greyscale(image) is False
+
+
 @pytest.fixture
 def sample_channel_data() -> np.ndarray:
     """Creates sample grayscale channel data for testing."""
@@ -182,3 +245,95 @@ def test_append_channel(
     )
 
     assert np.allclose(pixel_data[:, :, 3], 0.5)
+
+
+def test_create_image_from_channels(sample_channel_data: np.ndarray) -> None:
+    """Tests building a multi-channel ImageBuf from named channel data."""
+    height, width = sample_channel_data.shape
+    channels = [
+        ("R", sample_channel_data),
+        ("mask", np.ones((height, width), dtype=np.float32)),
+    ]
+    image_buf = create_image_from_channels(channels, width, height)
+
+    assert image_buf.spec().nchannels == 2
+    assert list(image_buf.spec().channelnames) == ["R", "mask"]
+    assert np.allclose(extract_channel(image_buf, "R"), 0.5)
+    assert np.allclose(extract_channel(image_buf, "mask"), 1.0)
+
+    with pytest.raises(ValueError):
+        create_image_from_channels([("R", np.zeros((2, 2)))], width, height)
+
+
+def test_pack_images(
+    sample_image_buf: oiio.ImageBuf, image_buf_fixture: oiio.ImageBuf
+) -> None:
+    """Tests packing the channels of several images into one ImageBuf."""
+    channel_names = ["R", "G", "B", "b_R", "b_G", "b_B", "b_A", "b_depth.Z"]
+    packed_image = pack_images([sample_image_buf, image_buf_fixture], channel_names)
+
+    assert packed_image.spec().nchannels == 8
+    assert list(packed_image.spec().channelnames) == channel_names
+    assert np.allclose(extract_channel(packed_image, "B"), 0.25)
+    assert np.allclose(extract_channel(packed_image, "b_A"), 0.75)
+    assert np.allclose(extract_channel(packed_image, "b_depth.Z"), 0.8)
+
+    with pytest.raises(ValueError):
+        pack_images([sample_image_buf], ["R", "G"])  # Wrong number of names
+
+
+@pytest.fixture
+def tall_image_buf() -> oiio.ImageBuf:
+    """Creates an RGB image taller than one scanline band, with a distinct value per row."""
+    width, height = 3, 300
+    spec = oiio.ImageSpec(width, height, 3, oiio.FLOAT)
+
+    image = oiio.ImageBuf(spec)
+
+    rows = np.arange(height, dtype=np.float32)[:, np.newaxis]
+    pixel_data = np.zeros((height, width, 3), dtype=np.float32)
+    pixel_data[:, :, 0] = rows
+    pixel_data[:, :, 1] = rows + 0.5
+    pixel_data[:, :, 2] = -rows
+
+    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, 3)
+    image.set_pixels(roi, pixel_data)
+
+    return image
+
+
+def test_append_channel_multiple_bands(tall_image_buf: oiio.ImageBuf) -> None:
+    """Tests that every scanline band is copied when appending a channel."""
+    spec = tall_image_buf.spec()
+    mask_data = np.full((spec.height, spec.width), 0.5, dtype=np.float32)
+    updated_image_buf = append_channel(tall_image_buf, mask_data, "mask")
+
+    for channel in ("R", "G", "B"):
+        assert np.array_equal(
+            extract_channel(updated_image_buf, channel),
+            extract_channel(tall_image_buf, channel),
+        )
+    assert np.allclose(extract_channel(updated_image_buf, "mask"), 0.5)
+
+
+def test_pack_images_multiple_bands(tall_image_buf: oiio.ImageBuf) -> None:
+    """Tests packing images taller than one scanline band into one ImageBuf."""
+    spec = tall_image_buf.spec()
+    depth_data = np.linspace(0.0, 1.0, spec.width * spec.height, dtype=np.float32)
+    depth_image = create_image_from_channels(
+        [("Z", depth_data.reshape((spec.height, spec.width)))],
+        spec.width,
+        spec.height,
+    )
+
+    channel_names = ["R", "G", "B", "depth_Z"]
+    packed_image = pack_images([tall_image_buf, depth_image], channel_names)
+
+    for channel in ("R", "G", "B"):
+        assert np.array_equal(
+            extract_channel(packed_image, channel),
+            extract_channel(tall_image_buf, channel),
+        )
+    assert np.array_equal(
+        extract_channel(packed_image, "depth_Z"), extract_channel(depth_image, "Z")
+    )
@@ -1,7 +1,7 @@
-import os
+from pathlib import Path
+
 import pytest
 import OpenImageIO as oiio
-import numpy as np
 
 from mask_layer_tool.image_loader import (
     load_image,
@@ -9,44 +9,62 @@ from mask_layer_tool.image_loader import (
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image() -> oiio.ImageBuf:
     """Creates a synthetic OIIO ImageBuf for testing."""
-    width, height = 4, 4
-    spec = oiio.ImageSpec(width, height, 4, oiio.FLOAT)  # RGBA format
-    image = oiio.ImageBuf(spec)
-
-    pixel_data = np.zeros((height, width, 4), dtype=np.float32)
-    pixel_data[:, :, 0] = 1.0  # Red channel
-    pixel_data[:, :, 1] = 0.5  # Green channel
-    pixel_data[:, :, 2] = 0.25  # Blue channel
-    pixel_data[:, :, 3] = 0.75  # Alpha channel
-
-    roi = oiio.ROI(0, width, 0, height, 0, 1, 0, 4)
-    image.set_pixels(roi, pixel_data)
+    # No test reads pixel values back, so a single zero-initialised pixel is enough
+    width, height = 1, 1
+    # RGBA in half floats, which both TIFF and EXR store natively, so no conversion on write
+    spec = oiio.ImageSpec(width, height, 4, oiio.HALF)
+    # Compression is pure overhead for a tiny image, on both write and load
+    spec.attribute("compression", "none")
 
-    return image
+    return oiio.ImageBuf(spec)
 
 
-@pytest.fixture
-def sample_image_file(tmpdir: str, sample_image: oiio.ImageBuf) -> str:
-    """Creates and saves a synthetic image for testing."""
-    temp_file = os.path.join(tmpdir, "test_image.exr")
+@pytest.fixture(scope="session")
+def sample_image_file(
+    tmp_path_factory: pytest.TempPathFactory, sample_image: oiio.ImageBuf
+) -> str:
+    """Creates and saves a synthetic image for testing, once per test session."""
+    # Uncompressed TIFF is the cheapest format to write and decode, skipping EXR's per-file setup
+    temp_file = str(tmp_path_factory.mktemp("imgs") / "test_image.tif")
     sample_image.write(temp_file)
 
     return temp_file
 
 
-def test_load_image(sample_image_file: str) -> None:
-    """Tests loading an image."""
+def test_roundtrip(sample_image_file: str, tmp_path: Path) -> None:
+    """Tests loading an image, saving it and loading the saved copy."""
     image = load_image(sample_image_file)
     assert isinstance(image, oiio.ImageBuf)
     assert image.initialized
 
-
-def test_save_image(sample_image: oiio.ImageBuf, tmpdir: str) -> None:
-    """Tests saving an image."""
-    output_path = tmpdir.mkdir("test_output")
-    save_image(sample_image, str(output_path), "test.exr")
-    saved_image = load_image(str(output_path) + "/test.exr")
+    output_path = tmp_path / "test_output"
+    output_path.mkdir()
+    save_image(image, str(output_path), "test.exr")
+    saved_image = load_image(str(output_path / "test.exr"))
     assert saved_image.initialized
+
+
+def test_save_image_keeps_spec(tmp_path: Path) -> None:
+    """Tests that saving an EXR does not change the compression of the caller's image."""
+    image = oiio.ImageBuf(oiio.ImageSpec(1, 1, 3, oiio.HALF))
+    image.specmod().attribute("compression", "piz")
+
+    save_image(image, str(tmp_path), "test.exr")
+
+    assert image.spec().getattribute("compression") == "piz"
+    assert (
+        load_image(str(tmp_path / "test.exr")).spec().getattribute("compression")
+        == "zips"
+    )
+
+
+def test_save_image_failure(sample_image: oiio.ImageBuf, tmp_path: Path) -> None:
+    """Tests that a failed save raises and leaves no partial files behind."""
+    output_path = tmp_path / "test_output"
+    output_path.mkdir()
+    with pytest.raises(ValueError):
+        save_image(sample_image, str(output_path), "test.unknown-format")
+    assert list(output_path.iterdir()) == []